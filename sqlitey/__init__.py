@@ -1,110 +1,413 @@
+import os
+import queue
 import sqlite3
+import sys
+import threading
+import weakref
+from abc import ABC, abstractmethod
 from collections import namedtuple
-from dataclasses import dataclass
-from functools import lru_cache
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import Any, Callable, Self, TypeAlias
+from typing import Any, ClassVar, Literal, Self, TypeAlias
 
 
 @dataclass(frozen=True)
 class DbPathConfig:
     """Database path configurations."""
 
-    # database filepath
-    database: Path
+    # database filepath, or a `file:` URI
+    database: Path | str
     # directory storing sql templates
     sql_templates_dir: Path | None = None
+    # pragmas set on the connection, e.g. `Db.FAST_PRAGMAS`, stored as pairs
+    # so the config stays hashable
+    pragmas: Mapping[str, str] | tuple[tuple[str, str], ...] | None = None
+    # read all the sql templates upfront, instead of on their first use
+    preload_templates: bool = False
+
+    def __post_init__(self) -> None:
+        if isinstance(self.pragmas, Mapping):
+            object.__setattr__(self, "pragmas", tuple(self.pragmas.items()))
+        if self.sql_templates_dir is None:
+            return
+        # resolved once, so template lookups share a single cache key per
+        # directory and do not depend on the current working directory
+        templates_dir = Path(self.sql_templates_dir).resolve()
+        object.__setattr__(self, "sql_templates_dir", templates_dir)
+        if self.preload_templates and templates_dir not in _preloaded_templates:
+            if not templates_dir.is_dir():
+                raise ValueError(f"No sql templates directory at {templates_dir}")
+            _preloaded_templates[templates_dir] = {
+                str(path.relative_to(templates_dir)): _read_sql_file(path)
+                for path in templates_dir.rglob("*.sql")
+            }
+
+
+# templates read upfront from the configs, once per directory and for the whole
+# process, kept regardless of the size of the templates cache
+_preloaded_templates: dict[Path, dict[str, str]] = {}
+
+
+def _read_sql_file(path: str | Path) -> str:
+    with open(path, "rb") as f:
+        return f.read().decode("utf-8").strip()
+
+
+@lru_cache(maxsize=256)
+def _read_cached_sql_template(filename: str, template_path: Path) -> str:
+    return _read_sql_file(os.path.join(template_path, filename))
 
 
-@lru_cache
 def _read_sql_template(filename: str, template_path: Path) -> str:
-    return (template_path / filename).read_text().strip()
+    try:
+        return _preloaded_templates[template_path][filename]
+    except KeyError:
+        return _read_cached_sql_template(filename, template_path)
 
 
-class Sql:
+class Sql(ABC):
     """Represent a SQL query."""
 
-    _is_templated = False
-
-    def __init__(self, query_loader: Callable, **kwargs) -> None:
-        self._query_loader = query_loader
-        self._store = kwargs
+    __slots__ = ()
 
     @property
     def has_template_path(self) -> bool:
-        return bool(self._is_templated and self._store.get("template_path"))
+        return False
 
     def set_template_path(self, template_path: Path) -> None:
-        if self._is_templated:
-            self._store["template_path"] = template_path
+        pass
 
-    def load_query(self) -> str:
-        if self._is_templated and not self.has_template_path:
-            raise ValueError("No template path configured")
-        return self._query_loader(**self._store)
+    @abstractmethod
+    def load_query(self) -> str: ...
 
     @classmethod
-    def raw(cls, query: str) -> Self:
-        return cls(lambda *args, **kwargs: query)
+    def raw(cls, query: str) -> "Sql":
+        # interned, so the same query text is shared across instances
+        return _RawSql(sys.intern(query))
 
     @classmethod
-    def template(cls, filename: str, *, path: Path | None = None) -> Self:
+    def template(cls, filename: str, *, path: Path | None = None) -> "Sql":
         # path is optional so we can defer setting at a later time, in order to
         # derive its value from a config for example.
-        cls_ = cls(_read_sql_template, template_path=path, filename=filename)
-        cls_._is_templated = True
-        return cls_
+        return _TemplateSql(filename, path)
+
+
+@dataclass(frozen=True, slots=True)
+class _RawSql(Sql):
+    """Represent a raw SQL query."""
+
+    text: str
+
+    def load_query(self) -> str:
+        return self.text
+
+
+@dataclass(slots=True, eq=False)
+class _TemplateSql(Sql):
+    """Represent a SQL query loaded from a template file."""
+
+    filename: str
+    # not frozen, as the path can be set later on from the `Db` config
+    path: Path | None = None
+    # query text, memoized once the template has been read
+    _resolved: str | None = field(default=None, init=False, repr=False)
+
+    @property
+    def has_template_path(self) -> bool:
+        return self.path is not None
+
+    def set_template_path(self, template_path: Path) -> None:
+        self.path = template_path
+        self._resolved = None
+
+    def load_query(self) -> str:
+        if self._resolved is not None:
+            return self._resolved
+        if self.path is None:
+            raise ValueError("No template path configured")
+        self._resolved = _read_sql_template(self.filename, self.path)
+        return self._resolved
 
 
 SqlRow: TypeAlias = Any
+SqlParams: TypeAlias = Sequence[Any] | Mapping[str, Any]
 RowFactory: TypeAlias = Callable[[sqlite3.Cursor, sqlite3.Row], SqlRow]
 
 
+def _per_description(build: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    """Memoize `build(description)` for the result set being fetched."""
+    # holds the last seen cursor description along its built value, the
+    # reference to the description keeps the identity check below safe
+    state: list[tuple[Any, Any]] = [(None, None)]
+
+    def get(description: Any) -> Any:
+        cached = state[0]
+        if cached[0] is not description:
+            cached = (description, build(description))
+            state[0] = cached
+        return cached[1]
+
+    return get
+
+
+def _column_names(description: Any) -> tuple[str, ...]:
+    return tuple(str(col[0]) for col in description)
+
+
+_dict_keys = _per_description(_column_names)
+
+
 def dict_factory(cursor: sqlite3.Cursor, row: sqlite3.Row) -> SqlRow:
-    return {col[0]: row[idx] for idx, col in enumerate(cursor.description)}
+    return dict(zip(_dict_keys(cursor.description), row))
+
+
+def make_dict_factory() -> RowFactory:
+    """Build a dict row factory reading the column names once per result set."""
+    keys = _per_description(_column_names)
+
+    def factory(cursor: sqlite3.Cursor, row: sqlite3.Row) -> SqlRow:
+        return dict(zip(keys(cursor.description), row))
+
+    return factory
+
+
+@lru_cache(maxsize=256)
+def _row_cls(fields: tuple[str, ...]) -> type:
+    try:
+        return namedtuple("Row", fields)  # type: ignore
+    except ValueError:
+        # column names which are not valid identifiers (e.g. `COUNT(id)`)
+        return namedtuple("Row", fields, rename=True)  # type: ignore
+
+
+# builds rows with a direct C level `tuple.__new__` call, skipping the Python
+# level `_make` and its length check, as rows always match their description
+_namedtuple_new = _per_description(
+    lambda description: partial(tuple.__new__, _row_cls(_column_names(description)))
+)
 
 
 def namedtuple_factory(cursor: sqlite3.Cursor, row: sqlite3.Row) -> SqlRow:
-    Row = namedtuple("Row", [str(col[0]) for col in cursor.description])  # type: ignore
-    return Row(*row)
+    return _namedtuple_new(cursor.description)(row)
+
 
+def _build_rows(
+    row_factory: RowFactory | None, description: Any, rows: list[tuple]
+) -> list[SqlRow]:
+    # builds rows of the factories applied by `Db` on batches of plain tuples,
+    # instead of calling back the factory from sqlite3 for every row
+    if row_factory is dict_factory:
+        cols = _column_names(description)
+        dict_, zip_ = dict, zip
+        return [dict_(zip_(cols, row)) for row in rows]
+    return list(map(_namedtuple_new(description), rows))
 
-_HOOKED_METHODS = ("execute", "executemany", "executescript")
+
+# rows are built in C, without calling back into Python for each row, and can be
+# accessed both by index and by column name
+sqlite_row_factory: RowFactory = sqlite3.Row  # type: ignore
+
+RowFactoryName: TypeAlias = Literal["tuple", "dict", "namedtuple", "sqlite3.Row"]
+
+_ROW_FACTORIES: dict[str, RowFactory | None] = {
+    "tuple": None,
+    "dict": dict_factory,
+    "namedtuple": namedtuple_factory,
+    "sqlite3.Row": sqlite_row_factory,
+}
+
+
+# size of the sqlite3 prepared statements cache per connection (default 128)
+_CACHED_STATEMENTS = 256
+
+# sizes passed down to `Db._fetch`, any positive value is used with fetchmany
+_FETCH_ALL = -1
+_FETCH_ONE = 0
+
+# shared default for queries without parameters
+_EMPTY: tuple = ()
+
+# number of rows fetched at once by `Db.iter`
+_ITER_BATCH_SIZE = 1000
+
+# `sqlite3.connect` arguments also applied to the read connections
+_READER_KWARGS = ("timeout", "detect_types", "factory", "cached_statements")
+
+
+class _Forbidden:
+    """Descriptor raising when accessing a protected cursor method."""
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self._name = name
+
+    def __get__(self, instance: Any, owner: type | None = None) -> Any:
+        raise AttributeError(f"Cannot access {self._name} from cursor directly")
 
 
 class _SafeCursor:
     """Proxy to protect `cursor.execute` to be accessed directly."""
 
+    __slots__ = ("_safe_cursor",)
+
+    execute = _Forbidden()
+    executemany = _Forbidden()
+    executescript = _Forbidden()
+
     def __init__(self, safe_cursor: sqlite3.Cursor) -> None:
         self._safe_cursor = safe_cursor
 
-    def __getattr__(self, name: str) -> Any:
-        if name in _HOOKED_METHODS:
-            raise AttributeError(f"Cannot access {name} from cursor directly")
-        return getattr(self._safe_cursor, name)
+    @property
+    def rowcount(self) -> int:
+        return self._safe_cursor.rowcount
+
+    @property
+    def lastrowid(self) -> int | None:
+        return self._safe_cursor.lastrowid
+
+    @property
+    def description(self) -> Any:
+        return self._safe_cursor.description
+
+    @property
+    def arraysize(self) -> int:
+        return self._safe_cursor.arraysize
+
+    @arraysize.setter
+    def arraysize(self, value: int) -> None:
+        self._safe_cursor.arraysize = value
+
+    def fetchone(self) -> SqlRow:
+        return self._safe_cursor.fetchone()
+
+    def fetchmany(self, size: int | None = None) -> list[SqlRow]:
+        if size is None:
+            size = self._safe_cursor.arraysize
+        return self._safe_cursor.fetchmany(size)
+
+    def fetchall(self) -> list[SqlRow]:
+        return self._safe_cursor.fetchall()
+
+    def close(self) -> None:
+        self._safe_cursor.close()
+
+    def __iter__(self) -> Self:
+        return self
+
+    def __next__(self) -> SqlRow:
+        return next(self._safe_cursor)
+
+
+TransactionMode: TypeAlias = Literal["DEFERRED", "IMMEDIATE", "EXCLUSIVE"]
+
+
+def _read_only_uri(database: Any) -> str:
+    if str(database) == ":memory:" or "mode=memory" in str(database):
+        raise ValueError("Cannot open read connections on an in-memory database")
+    if isinstance(database, str) and database.startswith("file:"):
+        sep = "&" if "?" in database else "?"
+        return f"{database}{sep}mode=ro"
+    return f"{Path(database).resolve().as_uri()}?mode=ro"
 
 
 class Db:
     """SQLite wrapper class."""
 
+    # pragmas tuned for throughput, can be passed as `Db(..., pragmas=...)`
+    FAST_PRAGMAS: ClassVar[dict[str, str]] = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "temp_store": "memory",
+        "cache_size": "-64000",
+        "mmap_size": "268435456",
+    }
+
     def __init__(
         self,
         *args,
-        row_factory: RowFactory | None = None,
+        row_factory: RowFactory | RowFactoryName | None = None,
         sql_templates_dir: Path | None = None,
         autocommit: bool = False,
+        pragmas: dict[str, str] | None = None,
+        readers: int = 0,
+        text_factory: Callable[[bytes], Any] | None = None,
         **kwargs,
     ) -> None:
+        if isinstance(row_factory, str):
+            try:
+                row_factory = _ROW_FACTORIES[row_factory]
+            except KeyError:
+                raise ValueError(f"Unknown row factory: {row_factory}") from None
         if autocommit:
             kwargs["isolation_level"] = None
+        kwargs.setdefault("cached_statements", _CACHED_STATEMENTS)
+        database = args[0] if args else kwargs.get("database")
+        if isinstance(database, str) and database.startswith("file:"):
+            kwargs.setdefault("uri", True)
+        if readers:
+            read_uri = _read_only_uri(database)
         self.conn = sqlite3.connect(*args, **kwargs)
+        if pragmas is not None:
+            for key, value in pragmas.items():
+                self.conn.execute(f"PRAGMA {key}={value}")
+        self._pragmas = pragmas
         if row_factory:
             self.conn.row_factory = row_factory
+        self._row_factory = row_factory
+        # e.g. `bytes`, to skip decoding TEXT values from UTF-8
+        if text_factory:
+            self.conn.text_factory = text_factory
+        self._text_factory = text_factory
+        self._batch_rows = row_factory in (dict_factory, namedtuple_factory)
         self.cursor = _SafeCursor(self.conn.cursor())
+        # bound once, rather than walking the cursor proxy on every query
+        self._raw_execute = self.cursor._safe_cursor.execute
+        self._raw_executemany = self.cursor._safe_cursor.executemany
+        self._raw_executescript = self.cursor._safe_cursor.executescript
         self._sql_templates_dir = sql_templates_dir
+        self._read_pool: queue.Queue[sqlite3.Connection] | None = None
+        # thread which last ran a statement on the main connection, so only its
+        # reads are routed to a pending transaction of the main connection
+        self._writer_thread: int | None = None
+        # set while in a `transaction` block, which commits on its own exit
+        self._in_transaction_block = False
+        if readers:
+            self._read_uri = read_uri
+            self._reader_kwargs = {k: kwargs[k] for k in _READER_KWARGS if k in kwargs}
+            self._open_read_pool(readers)
+        # plain tuples or rows built by sqlite3, fetched from the main cursor
+        self._direct_fetch = self._read_pool is None and not self._batch_rows
+
+    def _connect_reader(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self._read_uri, uri=True, check_same_thread=False, **self._reader_kwargs
+        )
+        if self._row_factory:
+            conn.row_factory = self._row_factory  # type: ignore
+        if self._text_factory:
+            conn.text_factory = self._text_factory
+        if self._pragmas is not None:
+            for key, value in self._pragmas.items():
+                # the journal mode is set on the database by `_open_read_pool`
+                if key != "journal_mode":
+                    conn.execute(f"PRAGMA {key}={value}")
+        return conn
+
+    def _open_read_pool(self, readers: int) -> None:
+        # readers do not block the writer, nor each other, in WAL mode
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self._read_pool = queue.Queue()
+        for _ in range(readers):
+            self._read_pool.put(self._connect_reader())
+        # readers of the finished iterations, kept warm for the next ones
+        self._iter_readers: queue.Queue[sqlite3.Connection] = queue.Queue(readers)
 
     @classmethod
     def from_config(cls, config: DbPathConfig, **kwargs) -> Self:
+        if config.pragmas is not None:
+            kwargs.setdefault("pragmas", dict(config.pragmas))
         return cls(
             config.database,
             sql_templates_dir=config.sql_templates_dir,
@@ -115,40 +418,267 @@ class Db:
         return self
 
     def __exit__(self, *args, **kwargs) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._read_pool is not None:
+            for readers in (self._read_pool, self._iter_readers):
+                while not readers.empty():
+                    readers.get_nowait().close()
+            # iterations still running close their reader on their own
+            self._read_pool = None
         self.conn.close()
 
+    @contextmanager
+    def transaction(self, mode: TransactionMode = "IMMEDIATE") -> Iterator[Self]:
+        """Batch statements in a single transaction, rolled back on errors."""
+        if self.conn.in_transaction:
+            # e.g. opened implicitly by sqlite3 on a previous write, without
+            # `autocommit`, its statements would be committed with this block
+            raise sqlite3.ProgrammingError(
+                "Cannot start a transaction, one is already open"
+            )
+        # immediate by default, taking the write lock upfront rather than on the
+        # first write, where it can fail on a busy database mid-transaction
+        self.conn.execute(f"BEGIN {mode}")
+        self._writer_thread = threading.get_ident()
+        self._in_transaction_block = True
+        try:
+            yield self
+            self.conn.execute("COMMIT")
+        except BaseException:
+            # also undoes a failed commit, e.g. on deferred constraints
+            if self.conn.in_transaction:
+                self.conn.execute("ROLLBACK")
+            raise
+        finally:
+            self._in_transaction_block = False
+
     def _pre_execute_hook(self, sql: Sql) -> None:
-        if not sql.has_template_path and self._sql_templates_dir:
+        # the concrete Sql class is the query kind tag, compared by identity
+        if type(sql) is _TemplateSql and sql.path is None and self._sql_templates_dir:
             # path is deferred, lets set it from the config
             sql.set_template_path(self._sql_templates_dir)
 
-    def __getattribute__(self, name: str) -> Any:
-        attr = super().__getattribute__(name)
-        # inject hook before running sensitive methods
-        if name in _HOOKED_METHODS:
-
-            def wrapper(*args, **kwargs):
-                self._pre_execute_hook(args[0])
-                return attr(*args, **kwargs)
+    def _resolve_template(self, sql: Sql) -> str:
+        # slow path, raw queries read their text directly from `sql.text`
+        self._pre_execute_hook(sql)
+        return sql.load_query()
 
-            return wrapper
-        return attr
+    def _load_query(self, sql: Sql) -> str:
+        return sql.text if type(sql) is _RawSql else self._resolve_template(sql)
 
-    def execute(self, sql: Sql, *args) -> SqlRow:
-        return self.cursor._safe_cursor.execute(sql.load_query(), *args)
+    def execute(self, sql: Sql, params: SqlParams = _EMPTY) -> SqlRow:
+        query = self._load_query(sql)
+        self._writer_thread = threading.get_ident()
+        return self._raw_execute(query, params)
 
-    def executemany(self, sql: Sql, *args) -> SqlRow:
-        return self.cursor._safe_cursor.executemany(sql.load_query(), *args)
+    def executemany(self, sql: Sql, seq_of_params: Iterable[SqlParams]) -> SqlRow:
+        query = self._load_query(sql)
+        self._writer_thread = threading.get_ident()
+        return self._raw_executemany(query, seq_of_params)
 
     def executescript(self, sql: Sql) -> SqlRow:
-        return self.cursor._safe_cursor.executescript(sql.load_query())
-
-    def fetchone(self, sql: Sql, *args) -> SqlRow:
-        return self.execute(sql, *args).fetchone()
+        query = self._load_query(sql)
+        self._writer_thread = threading.get_ident()
+        return self._raw_executescript(query)
+
+    def _fetch_batch(self, cursor: sqlite3.Cursor, size: int) -> list[SqlRow]:
+        # skip the per row factory callback, the rows are fetched as plain
+        # tuples and then built in one go from the cursor description
+        cursor.row_factory = None
+        try:
+            if size == _FETCH_ALL:
+                rows = cursor.fetchall()
+            else:
+                rows = cursor.fetchmany(size or 1)
+        finally:
+            cursor.row_factory = self._row_factory  # type: ignore
+        if not rows:
+            # also covers statements not returning data, without description
+            return rows
+        return _build_rows(self._row_factory, cursor.description, rows)
+
+    def _fetch_rows(self, cursor: sqlite3.Cursor, size: int) -> SqlRow:
+        if self._batch_rows:
+            rows = self._fetch_batch(cursor, size)
+            if size == _FETCH_ONE:
+                return rows[0] if rows else None
+            return rows
+        if size == _FETCH_ALL:
+            return cursor.fetchall()
+        if size == _FETCH_ONE:
+            return cursor.fetchone()
+        return cursor.fetchmany(size)
+
+    def _in_own_transaction(self) -> bool:
+        # pending writes are only visible from the main connection, and only
+        # to the thread which made them, other threads read committed data
+        return self.conn.in_transaction and self._writer_thread == threading.get_ident()
+
+    def _fetch(self, sql: Sql, params: SqlParams, size: int) -> SqlRow:
+        query = self._load_query(sql)
+        read_pool = self._read_pool
+        if read_pool is None or self._in_own_transaction():
+            # reads need to see the writes of a pending transaction, which are
+            # only visible from the main connection
+            return self._fetch_rows(self._raw_execute(query, params), size)
+        conn = read_pool.get()
+        try:
+            return self._fetch_rows(conn.execute(query, params), size)
+        finally:
+            read_pool.put(conn)
+
+    def fetchone(self, sql: Sql, params: SqlParams = _EMPTY) -> SqlRow:
+        if self._direct_fetch:
+            # inlined, saving a call on the fast path
+            query = sql.text if type(sql) is _RawSql else self._resolve_template(sql)
+            return self._raw_execute(query, params).fetchone()
+        return self._fetch(sql, params, _FETCH_ONE)
+
+    def fetchmany(
+        self, sql: Sql, size: int, params: SqlParams = _EMPTY
+    ) -> list[SqlRow]:
+        if size < 1:
+            raise ValueError("size must be a positive integer")
+        return self._fetch(sql, params, size)
+
+    def fetchall(self, sql: Sql, params: SqlParams = _EMPTY) -> list[SqlRow]:
+        if self._direct_fetch:
+            # inlined as in `fetchone`
+            query = sql.text if type(sql) is _RawSql else self._resolve_template(sql)
+            return self._raw_execute(query, params).fetchall()
+        return self._fetch(sql, params, _FETCH_ALL)
+
+    def iter(
+        self,
+        sql: Sql,
+        params: SqlParams = _EMPTY,
+        *,
+        batch_size: int = _ITER_BATCH_SIZE,
+    ) -> Iterator[SqlRow]:
+        """Stream the rows of a query, without loading them all in memory."""
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive integer")
+        query = self._load_query(sql)
+        read_pool = self._read_pool
+        if read_pool is None or self._in_own_transaction():
+            conn = self.conn
+        else:
+            # a reader apart from the pool, as the iteration can outlive any
+            # number of queries, a pooled one would be held and starve them
+            try:
+                conn = self._iter_readers.get_nowait()
+            except queue.Empty:
+                conn = self._connect_reader()
+        try:
+            # use a dedicated cursor, so other queries can run while iterating
+            cursor = conn.execute(query, params)
+            try:
+                # rows are fetched by batches, and factories applied per batch
+                cursor.arraysize = batch_size
+                row_factory, description = self._row_factory, cursor.description
+                batch_rows = self._batch_rows and description is not None
+                if batch_rows:
+                    cursor.row_factory = None
+                fetchmany = cursor.fetchmany
+                while rows := fetchmany():
+                    if batch_rows:
+                        rows = _build_rows(row_factory, description, rows)
+                    yield from rows
+            finally:
+                try:
+                    cursor.close()
+                except sqlite3.ProgrammingError:
+                    pass  # the Db was closed before the end of the iteration
+        finally:
+            if conn is not self.conn:
+                if self._read_pool is None:
+                    conn.close()  # the Db was closed before the end of the iteration
+                else:
+                    try:
+                        self._iter_readers.put_nowait(conn)
+                    except queue.Full:
+                        conn.close()
+
+    def commit(self, sql: Sql, params: SqlParams = _EMPTY) -> None:
+        query = self._load_query(sql)
+        self._raw_execute(query, params)
+        if not self._in_transaction_block:
+            # the statements of a `transaction` block are committed on its exit
+            self.conn.commit()
+
+    def commit_many(self, sql: Sql, seq_of_params: Iterable[SqlParams]) -> None:
+        query = self._load_query(sql)
+        if not self.conn.in_transaction:
+            # a single transaction for all the rows, even in autocommit mode
+            with self.transaction():
+                self._raw_executemany(query, seq_of_params)
+            return
+        # nested in the pending transaction, so errors only undo these rows
+        self.conn.execute("SAVEPOINT commit_many")
+        try:
+            self._raw_executemany(query, seq_of_params)
+        except BaseException:
+            self.conn.execute("ROLLBACK TO commit_many")
+            self.conn.execute("RELEASE commit_many")
+            raise
+        self.conn.execute("RELEASE commit_many")
+        if not self._in_transaction_block:
+            # the rows of a `transaction` block are committed on its exit
+            self.conn.commit()
+
+
+class _ThreadDb:
+    """Holder of the `Db` of a thread, dropped with the thread locals."""
+
+    __slots__ = ("__weakref__", "db")
+
+    def __init__(self, db: Db) -> None:
+        self.db = db
+
+
+class DbPool:
+    """Long-lived `Db` instances, one per thread."""
+
+    def __init__(self, config: DbPathConfig, **kwargs) -> None:
+        self._config = config
+        # instances are only used from their own thread, but can be closed
+        # from any thread by `close`
+        kwargs["check_same_thread"] = False
+        self._kwargs = kwargs
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._dbs: list[Db] = []
 
-    def fetchall(self, sql: Sql, *args) -> list[SqlRow]:
-        return self.execute(sql, *args).fetchall()
+    def __enter__(self) -> Self:
+        return self
 
-    def commit(self, sql: Sql, *args) -> None:
-        self.execute(sql, *args)
-        self.conn.commit()
+    def __exit__(self, *args, **kwargs) -> None:
+        self.close()
+
+    def get(self) -> Db:
+        """Get the `Db` of the current thread, opening it on first use."""
+        holder = getattr(self._local, "holder", None)
+        if holder is None:
+            db = Db.from_config(self._config, **self._kwargs)
+            holder = _ThreadDb(db)
+            self._local.holder = holder
+            with self._lock:
+                self._dbs.append(db)
+            # the thread locals are cleared on thread exit, closing its `Db`
+            weakref.finalize(holder, self._release, db)
+        return holder.db
+
+    def _release(self, db: Db) -> None:
+        with self._lock:
+            if db in self._dbs:
+                self._dbs.remove(db)
+        db.close()
+
+    def close(self) -> None:
+        with self._lock:
+            dbs, self._dbs = self._dbs, []
+        for db in dbs:
+            db.close()
+        self._local = threading.local()
@@ -1,40 +1,81 @@
 import re
 import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
 from pathlib import Path
 from sqlite3.dbapi2 import OperationalError
 from tempfile import NamedTemporaryFile
+from uuid import uuid4
 
 from pytest import fixture, raises
 
-from sqlitey import Db, DbPathConfig, Sql, dict_factory, namedtuple_factory
+from sqlitey import (
+    Db,
+    DbPool,
+    DbPathConfig,
+    Sql,
+    dict_factory,
+    make_dict_factory,
+    namedtuple_factory,
+    sqlite_row_factory,
+)
+
+
+def _create_users(conn):
+    conn.executescript(
+        "BEGIN;"
+        "CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT);"
+        "INSERT INTO users VALUES (1, 'Alice'), (2, 'John');"
+        "COMMIT;"
+    )
 
 
 @fixture
 def temp_db_path():
     with NamedTemporaryFile(suffix=".db", delete=True) as tmp:
         db_path = Path(tmp.name)
-        conn = sqlite3.connect(db_path)
-        conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT)")
-        conn.execute("INSERT INTO users VALUES (1, 'Alice'), (2, 'John')")
-        conn.commit()
+        conn = sqlite3.connect(db_path, isolation_level=None)
+        _create_users(conn)
         conn.close()
         yield db_path
 
 
 @fixture
-def config(temp_db_path):
+def memory_db_uri():
+    uri = f"file:test_{uuid4().hex}?mode=memory&cache=shared"
+    # the shared in-memory database lives as long as a connection is open
+    conn = sqlite3.connect(uri, uri=True, isolation_level=None)
+    _create_users(conn)
+    yield uri
+    conn.close()
+
+
+@fixture
+def config(memory_db_uri):
     return DbPathConfig(
-        database=temp_db_path,
+        database=memory_db_uri,
         sql_templates_dir=Path(__file__).resolve().parent / "sql"
     )
 
 
+@fixture
+def file_config(temp_db_path):
+    return DbPathConfig(database=temp_db_path)
+
+
 def test_raw_sql():
     """Test loading raw SQL."""
     sql = Sql.raw("SELECT 1")
     assert sql.load_query() == "SELECT 1"
 
 
+def test_sql_abstract():
+    """Test Sql is only built from its raw and template constructors."""
+    with raises(TypeError):
+        Sql()
+
+
 def test_template_sql_no_path_config():
     """Test loading a template without a path."""
     sql = Sql.template("test.sql")
@@ -178,3 +219,510 @@ def test_executemany(config):
         results = db.fetchall(Sql.raw("SELECT name FROM users"))
     assert "Alicia" in str(results)
     assert "Bobby" in str(results)
+
+
+def test_namedtuple_factory_reuses_row_class(config):
+    """Test the namedtuple factory builds a single class per set of columns."""
+    sql = Sql.raw("SELECT id, name FROM users")
+    with Db.from_config(config, row_factory=namedtuple_factory) as db:
+        results = db.fetchall(sql)
+    assert type(results[0]) is type(results[1])
+
+
+def test_namedtuple_factory_invalid_identifier(config):
+    """Test the namedtuple factory handles non identifier column names."""
+    sql = Sql.raw("SELECT COUNT(id) FROM users")
+    with Db.from_config(config, row_factory=namedtuple_factory) as db:
+        result = db.fetchone(sql)
+    assert result[0] == 2
+
+
+def test_db_execute_dict_factory(config):
+    """Test rows fetched from execute still go through the dict factory."""
+    sql = Sql.raw("SELECT id, name FROM users")
+    with Db.from_config(config, row_factory=dict_factory) as db:
+        assert db.fetchone(Sql.raw("SELECT id FROM users WHERE id = 3")) is None
+        result = db.execute(sql).fetchone()
+    assert result == {"id": 1, "name": "Alice"}
+
+
+def test_db_pragmas(file_config):
+    """Test setting pragmas on the connection."""
+    with Db.from_config(file_config, pragmas=Db.FAST_PRAGMAS) as db:
+        journal_mode = db.fetchone(Sql.raw("PRAGMA journal_mode"))
+        synchronous = db.fetchone(Sql.raw("PRAGMA synchronous"))
+    assert journal_mode == ("wal",)
+    assert synchronous == (1,)  # NORMAL
+
+
+def test_db_transaction(config):
+    """Test batching statements in a transaction."""
+    sql = Sql.raw("INSERT INTO users VALUES (?, ?)")
+    with Db.from_config(config) as db:
+        with db.transaction():
+            db.execute(sql, (3, "Kate"))
+            db.executemany(sql, [(4, "Johny"), (5, "Bob")])
+    with Db.from_config(config) as db:
+        result = db.fetchone(Sql.raw("SELECT COUNT(id) FROM users"))
+    assert result == (5,)
+
+
+def test_db_transaction_rollback(config):
+    """Test a transaction is rolled back on errors."""
+    with Db.from_config(config, autocommit=True) as db:
+        with raises(OperationalError):
+            with db.transaction():
+                db.execute(Sql.raw("INSERT INTO users VALUES (3, 'Kate')"))
+                db.execute(Sql.raw("SYNTAX ERROR"))  # raise
+        result = db.fetchone(Sql.raw("SELECT id FROM users WHERE id = 3"))
+    assert result is None
+
+
+def test_db_transaction_already_open(config):
+    """Test a transaction cannot start while another one is pending."""
+    with Db.from_config(config) as db:
+        db.execute(Sql.raw("INSERT INTO users VALUES (3, 'Kate')"))
+        with raises(sqlite3.ProgrammingError, match="already open"):
+            with db.transaction():
+                pass
+        assert db.fetchone(Sql.raw("SELECT id FROM users WHERE id = 3")) == (3,)
+
+
+def test_db_transaction_commit_rollback(config):
+    """Test a transaction is rolled back when it fails to commit."""
+    with Db.from_config(
+        config, autocommit=True, pragmas={"foreign_keys": "ON"}
+    ) as db:
+        db.execute(
+            Sql.raw(
+                "CREATE TABLE posts (user_id INTEGER REFERENCES users (id) "
+                "DEFERRABLE INITIALLY DEFERRED)"
+            )
+        )
+        with raises(sqlite3.IntegrityError):
+            with db.transaction():
+                db.execute(Sql.raw("INSERT INTO posts VALUES (3)"))  # no user 3
+        assert not db.conn.in_transaction
+        result = db.fetchone(Sql.raw("SELECT COUNT(*) FROM posts"))
+    assert result == (0,)
+
+
+def test_db_readers(file_config):
+    """Test fetching rows concurrently from the read connections."""
+    sql = Sql.raw("SELECT id, name FROM users")
+    with Db.from_config(file_config, readers=2) as db:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(lambda _: db.fetchall(sql), range(8)))
+    assert results == [[(1, "Alice"), (2, "John")]] * 8
+
+
+def test_db_readers_pending_transaction(file_config):
+    """Test reads see the writes of a pending transaction."""
+    with Db.from_config(file_config, readers=1) as db:
+        db.execute(Sql.raw("INSERT INTO users VALUES (3, 'Kate')"))
+        result = db.fetchone(Sql.raw("SELECT name FROM users WHERE id = 3"))
+    assert result == ("Kate",)
+
+
+def test_db_readers_pending_transaction_other_thread(file_config):
+    """Test other threads do not see the writes of a pending transaction."""
+    sql = Sql.raw("SELECT name FROM users WHERE id = 3")
+    with Db.from_config(file_config, readers=1, check_same_thread=False) as db:
+        db.execute(Sql.raw("INSERT INTO users VALUES (3, 'Kate')"))
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            other = executor.submit(db.fetchone, sql).result()
+        assert db.fetchone(sql) == ("Kate",)
+    assert other is None
+
+
+def test_db_readers_iter(file_config):
+    """Test querying while streaming rows with a single read connection."""
+    sql = Sql.raw("SELECT id FROM users")
+    with Db.from_config(file_config, readers=1) as db:
+        rows = db.iter(sql)
+        first = next(rows)
+        result = db.fetchone(Sql.raw("SELECT name FROM users WHERE id = 2"))
+        remaining = list(rows)
+    assert first == (1,)
+    assert result == ("John",)
+    assert remaining == [(2,)]
+
+
+def test_db_readers_iter_interleaved(file_config):
+    """Test streaming rows from interleaved iterations over read connections."""
+    sql = Sql.raw("SELECT id FROM users")
+    with Db.from_config(file_config, readers=1) as db:
+        for _ in range(2):
+            results = list(zip(db.iter(sql), db.iter(sql)))
+            assert results == [((1,), (1,)), ((2,), (2,))]
+        rows = db.iter(sql)
+        first = next(rows)
+    assert [first, *rows] == [(1,), (2,)]
+
+
+def test_db_readers_in_memory(memory_db_uri):
+    """Test read connections cannot be opened on an in-memory database."""
+    with raises(ValueError, match="Cannot open read connections"):
+        Db(":memory:", readers=1)
+    with raises(ValueError, match="Cannot open read connections"):
+        Db(memory_db_uri, readers=1)
+
+
+def test_db_readers_file_uri(temp_db_path):
+    """Test opening read connections on a database given as a URI."""
+    with Db(temp_db_path.as_uri(), readers=1) as db:
+        result = db.fetchone(Sql.raw("SELECT name FROM users WHERE id = 1"))
+    assert result == ("Alice",)
+
+
+def test_db_readers_connect_kwargs(temp_db_path):
+    """Test the read connections are opened with the connect arguments."""
+    sql = Sql.raw("SELECT 1.5 AS \"value [half]\"")
+    converters = sqlite3.converters.copy()
+    sqlite3.register_converter("half", lambda value: float(value) / 2)
+    try:
+        with Db(
+            temp_db_path, readers=1, detect_types=sqlite3.PARSE_COLNAMES
+        ) as db:
+            result = db.fetchone(sql)
+    finally:
+        sqlite3.converters.clear()
+        sqlite3.converters.update(converters)
+    assert result == (0.75,)
+
+
+def test_db_readers_pragmas(file_config):
+    """Test the pragmas are also set on the read connections."""
+    with Db.from_config(file_config, readers=1, pragmas=Db.FAST_PRAGMAS) as db:
+        cache_size = db.fetchone(Sql.raw("PRAGMA cache_size"))
+        mmap_size = db.fetchone(Sql.raw("PRAGMA mmap_size"))
+    assert cache_size == (-64000,)
+    assert mmap_size == (268435456,)
+
+
+def test_cursor_proxy(config):
+    """Test reading results through the cursor proxy."""
+    with Db.from_config(config) as db:
+        with raises(AttributeError, match="Cannot access executemany"):
+            db.cursor.executemany
+        db.execute(Sql.raw("SELECT id FROM users"))
+        assert db.cursor.description[0][0] == "id"
+        assert db.cursor.fetchmany() == [(1,)]
+        assert list(db.cursor) == [(2,)]
+
+
+def test_template_sql_set_template_path():
+    """Test changing the template path reloads the query."""
+    sql = Sql.template("test.sql", path=Path(__file__).resolve().parent / "sql")
+    assert sql.load_query() == "SELECT 1;"
+    sql.set_template_path(Path(__file__).resolve().parent)
+    with raises(FileNotFoundError):
+        sql.load_query()
+
+
+def test_db_fetchmany(config):
+    """Test using fetchmany."""
+    sql = Sql.raw("SELECT id, name FROM users WHERE id >= ?")
+    with Db.from_config(config) as db:
+        results = db.fetchmany(sql, 1, (1,))
+    assert results == [(1, "Alice")]
+
+
+def test_db_fetchmany_dict_factory(config):
+    """Test using fetchmany and the dict factory."""
+    sql = Sql.raw("SELECT id, name FROM users")
+    with Db.from_config(config, row_factory=dict_factory) as db:
+        results = db.fetchmany(sql, 5)
+    assert results == [{"id": 1, "name": "Alice"}, {"id": 2, "name": "John"}]
+
+
+def test_db_make_dict_factory(config):
+    """Test using a dict factory built from make_dict_factory."""
+    with Db.from_config(config, row_factory=make_dict_factory()) as db:
+        results = db.fetchall(Sql.raw("SELECT id, name FROM users"))
+        result = db.fetchone(Sql.raw("SELECT name AS username FROM users"))
+    assert results == [{"id": 1, "name": "Alice"}, {"id": 2, "name": "John"}]
+    assert result == {"username": "Alice"}
+
+
+def test_db_iter(config):
+    """Test streaming rows with iter."""
+    sql = Sql.raw("SELECT id, name FROM users")
+    with Db.from_config(config) as db:
+        rows = db.iter(sql)
+        assert next(rows) == (1, "Alice")
+        # other queries can run while iterating
+        assert db.fetchone(Sql.raw("SELECT COUNT(id) FROM users")) == (2,)
+        assert list(rows) == [(2, "John")]
+
+
+def test_db_iter_dict_factory(file_config):
+    """Test streaming rows with iter and the dict factory."""
+    sql = Sql.raw("SELECT id, name FROM users")
+    with Db.from_config(file_config, row_factory=dict_factory, readers=1) as db:
+        results = list(db.iter(sql))
+    assert results == [{"id": 1, "name": "Alice"}, {"id": 2, "name": "John"}]
+
+
+def test_db_fetchone_sqlite_row_factory(config):
+    """Test using fetchone and the sqlite3.Row factory."""
+    sql = Sql.raw("SELECT id, name FROM users WHERE id = ?")
+    with Db.from_config(config, row_factory=sqlite_row_factory) as db:
+        result = db.fetchone(sql, (1,))
+    assert result["name"] == "Alice"
+    assert result[0] == 1
+
+
+def test_db_row_factory_name(config):
+    """Test selecting a row factory by name."""
+    sql = Sql.raw("SELECT id, name FROM users WHERE id = ?")
+    with Db.from_config(config, row_factory="dict") as db:
+        result = db.fetchone(sql, (1,))
+    assert result == {"id": 1, "name": "Alice"}
+    with raises(ValueError, match="Unknown row factory: list"):
+        Db.from_config(config, row_factory="list")
+
+
+def test_db_pragmas_from_config(temp_db_path):
+    """Test setting pragmas from a config."""
+    config = DbPathConfig(database=temp_db_path, pragmas={"synchronous": "OFF"})
+    with Db.from_config(config) as db:
+        result = db.fetchone(Sql.raw("PRAGMA synchronous"))
+    assert result == (0,)
+
+
+def test_config_pragmas_hashable(temp_db_path):
+    """Test a config with pragmas can be hashed."""
+    config = DbPathConfig(database=temp_db_path, pragmas=Db.FAST_PRAGMAS)
+    assert config.pragmas == tuple(Db.FAST_PRAGMAS.items())
+    assert hash(config) == hash(
+        DbPathConfig(database=temp_db_path, pragmas=dict(Db.FAST_PRAGMAS))
+    )
+
+
+def test_db_iter_interleaved_namedtuple_factory(config):
+    """Test the namedtuple factory with interleaved result sets."""
+    with Db.from_config(config, row_factory=namedtuple_factory) as db:
+        ids = db.iter(Sql.raw("SELECT id FROM users"))
+        names = db.iter(Sql.raw("SELECT name FROM users"))
+        rows = [next(ids), next(names), next(ids), next(names)]
+    assert [rows[0].id, rows[1].name, rows[2].id, rows[3].name] == [
+        1,
+        "Alice",
+        2,
+        "John",
+    ]
+
+
+def test_db_fetch_namedtuple_factory_no_data(config):
+    """Test fetching from a statement returning no data."""
+    with Db.from_config(config, row_factory=namedtuple_factory) as db:
+        assert db.fetchall(Sql.raw("INSERT INTO users VALUES (3, 'Kate')")) == []
+        assert db.fetchone(Sql.raw("SELECT id FROM users WHERE id = 4")) is None
+        assert list(db.iter(Sql.raw("DELETE FROM users WHERE id = 3"))) == []
+
+
+def test_db_commit_many(config):
+    """Test using commit_many."""
+    rows = [(3, "Kate"), (4, "Johny")]
+    with Db.from_config(config, autocommit=True) as db:
+        db.commit_many(Sql.raw("INSERT INTO users VALUES (?, ?)"), rows)
+    with Db.from_config(config) as db:
+        db.execute(Sql.raw("DELETE FROM users WHERE id = 1"))
+        db.commit_many(Sql.raw("INSERT INTO users VALUES (?, ?)"), [(5, "Bob")])
+    with Db.from_config(config) as db:
+        results = db.fetchall(Sql.raw("SELECT id FROM users"))
+    assert results == [(2,), (3,), (4,), (5,)]
+
+
+def test_db_commit_many_rollback(config):
+    """Test commit_many does not write any row on errors."""
+    rows = [(3, "Kate"), (1, "Alice")]  # duplicated primary key
+    with Db.from_config(config, autocommit=True) as db:
+        with raises(sqlite3.IntegrityError):
+            db.commit_many(Sql.raw("INSERT INTO users VALUES (?, ?)"), rows)
+        result = db.fetchone(Sql.raw("SELECT id FROM users WHERE id = 3"))
+    assert result is None
+
+
+def test_db_commit_many_in_transaction(config):
+    """Test commit_many does not commit an enclosing transaction."""
+    sql = Sql.raw("INSERT INTO users VALUES (?, ?)")
+    with Db.from_config(config) as db:
+        with raises(OperationalError):
+            with db.transaction():
+                db.commit_many(sql, [(3, "Kate")])
+                db.execute(Sql.raw("SYNTAX ERROR"))  # raise
+        result = db.fetchone(Sql.raw("SELECT id FROM users WHERE id = 3"))
+    assert result is None
+
+
+def test_db_commit_in_transaction(config):
+    """Test commit does not commit an enclosing transaction."""
+    sql = Sql.raw("INSERT INTO users VALUES (?, ?)")
+    with Db.from_config(config, autocommit=True) as db:
+        with raises(OperationalError):
+            with db.transaction():
+                db.execute(sql, (3, "Kate"))
+                db.commit(sql, (4, "Johny"))
+                db.execute(sql, (5, "Bob"))
+                db.execute(Sql.raw("SYNTAX ERROR"))  # raise
+        result = db.fetchone(Sql.raw("SELECT COUNT(id) FROM users"))
+    assert result == (2,)
+
+
+def test_db_commit_many_pending_transaction_rollback(config):
+    """Test commit_many only undoes its own rows in a pending transaction."""
+    rows = [(3, "Kate"), (2, "John")]  # duplicated primary key
+    with Db.from_config(config) as db:
+        db.execute(Sql.raw("DELETE FROM users WHERE id = 1"))
+        with raises(sqlite3.IntegrityError):
+            db.commit_many(Sql.raw("INSERT INTO users VALUES (?, ?)"), rows)
+        assert db.conn.in_transaction
+        db.commit(Sql.raw("DELETE FROM users WHERE id = 4"))
+    with Db.from_config(config) as db:
+        results = db.fetchall(Sql.raw("SELECT id FROM users"))
+    assert results == [(2,)]
+
+
+def test_raw_sql_value_object():
+    """Test raw SQL instances are immutable values."""
+    sql = Sql.raw("SELECT 1")
+    assert sql == Sql.raw("SELECT 1")
+    assert hash(sql) == hash(Sql.raw("SELECT 1"))
+    with raises(AttributeError):
+        sql.text = "SELECT 2"
+
+
+def test_db_namedtuple_factory_api(config):
+    """Test namedtuple rows keep the namedtuple API."""
+    sql = Sql.raw("SELECT id, name FROM users WHERE id = ?")
+    with Db.from_config(config, row_factory=namedtuple_factory) as db:
+        result = db.fetchone(sql, (1,))
+        streamed = next(db.iter(sql, (1,)))
+    assert result._asdict() == {"id": 1, "name": "Alice"}
+    assert result._fields == ("id", "name")
+    assert streamed == result
+
+
+def test_db_pool(config):
+    """Test reusing long-lived Db instances from a pool."""
+    sql = Sql.raw("SELECT name FROM users WHERE id = ?")
+    with DbPool(config) as pool:
+        db = pool.get()
+        assert pool.get() is db
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            other = executor.submit(pool.get).result()
+            assert other is not db
+            assert db.fetchone(sql, (1,)) == ("Alice",)
+            assert other.fetchone(sql, (2,)) == ("John",)
+    with raises(sqlite3.ProgrammingError):
+        other.fetchone(sql, (1,))
+
+
+def test_db_pool_thread_exit(config):
+    """Test the Db of a thread is closed once the thread exits."""
+    sql = Sql.raw("SELECT name FROM users WHERE id = ?")
+    dbs = []
+    with DbPool(config) as pool:
+        thread = threading.Thread(target=lambda: dbs.append(pool.get()))
+        thread.start()
+        thread.join()
+        with raises(sqlite3.ProgrammingError):
+            dbs[0].fetchone(sql, (1,))
+
+
+def test_db_transaction_mode(file_config):
+    """Test immediate transactions take the write lock upfront."""
+    with Db.from_config(file_config) as db:
+        with Db.from_config(file_config, timeout=0) as other:
+            with db.transaction():
+                with raises(OperationalError, match="database is locked"):
+                    with other.transaction():
+                        pass
+            with db.transaction("DEFERRED"):
+                with other.transaction("DEFERRED"):
+                    pass
+
+
+def test_config_resolves_sql_templates_dir(temp_db_path, monkeypatch):
+    """Test the templates directory is resolved from the config."""
+    monkeypatch.chdir(Path(__file__).resolve().parent)
+    config = DbPathConfig(database=temp_db_path, sql_templates_dir=Path("sql"))
+    assert config.sql_templates_dir == Path(__file__).resolve().parent / "sql"
+
+
+def test_db_text_factory(file_config):
+    """Test returning TEXT values as bytes."""
+    sql = Sql.raw("SELECT name FROM users WHERE id = 1")
+    with Db.from_config(file_config, text_factory=bytes, readers=1) as db:
+        assert db.fetchone(sql) == (b"Alice",)
+        db.execute(Sql.raw("UPDATE users SET name = 'Alicia' WHERE id = 1"))
+        assert db.fetchone(sql) == (b"Alicia",)
+
+
+def test_db_iter_batch_size(config):
+    """Test streaming rows by batches."""
+    sql = Sql.raw("SELECT id FROM users")
+    with Db.from_config(config, row_factory="namedtuple") as db:
+        db.executemany(Sql.raw("INSERT INTO users VALUES (?, 'Bob')"), [(3,), (4,)])
+        results = [row.id for row in db.iter(sql, batch_size=3)]
+    assert results == [1, 2, 3, 4]
+
+
+def test_db_iter_invalid_batch_size(config):
+    """Test streaming rows by batches of an invalid size."""
+    with Db.from_config(config) as db:
+        for batch_size in (0, -1):
+            with raises(ValueError, match="positive integer"):
+                list(db.iter(Sql.raw("SELECT id FROM users"), batch_size=batch_size))
+
+
+def test_config_preload_templates(temp_db_path, tmp_path):
+    """Test preloading the sql templates from a config."""
+    (tmp_path / "preloaded.sql").write_text("SELECT 2;")
+    config = DbPathConfig(
+        database=temp_db_path, sql_templates_dir=tmp_path, preload_templates=True
+    )
+    # the template was read when creating the config
+    (tmp_path / "preloaded.sql").unlink()
+    with Db.from_config(config) as db:
+        result = db.fetchone(Sql.template("preloaded.sql"))
+    assert result == (2,)
+
+
+def test_config_preload_templates_once(temp_db_path, tmp_path):
+    """Test the sql templates of a directory are only preloaded once."""
+    (tmp_path / "preloaded.sql").write_text("SELECT 1;")
+    config = DbPathConfig(
+        database=temp_db_path, sql_templates_dir=tmp_path, preload_templates=True
+    )
+    (tmp_path / "preloaded.sql").write_text("SELECT 2;")
+    copy = replace(config)
+    with Db.from_config(copy) as db:
+        result = db.fetchone(Sql.template("preloaded.sql"))
+    assert result == (1,)
+
+
+def test_config_preload_many_templates(temp_db_path, tmp_path):
+    """Test preloading more sql templates than the templates cache holds."""
+    for i in range(300):
+        (tmp_path / f"query_{i}.sql").write_text(f"SELECT {i};")
+    config = DbPathConfig(
+        database=temp_db_path, sql_templates_dir=tmp_path, preload_templates=True
+    )
+    for path in tmp_path.glob("*.sql"):
+        path.unlink()
+    with Db.from_config(config) as db:
+        results = [db.fetchone(Sql.template(f"query_{i}.sql")) for i in range(300)]
+    assert results == [(i,) for i in range(300)]
+
+
+def test_config_preload_templates_missing_dir(temp_db_path, tmp_path):
+    """Test preloading the sql templates from a missing directory."""
+    with raises(ValueError, match="No sql templates directory"):
+        DbPathConfig(
+            database=temp_db_path,
+            sql_templates_dir=tmp_path / "missing",
+            preload_templates=True,
+        )